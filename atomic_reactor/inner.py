@@ -268,6 +268,10 @@ class DockerBuildWorkflow(object):
         # set by squash plugin
         self.exported_squashed_image = {}
 
+        # OSBS clients shared by plugins
+        # (url, verify_ssl, use_auth) -> OSBS instance
+        self.osbs_clients = {}
+
         self.tag_conf = TagConf()
         self.push_conf = PushConf()
         if target_registries:
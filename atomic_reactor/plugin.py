@@ -10,17 +10,20 @@ definition of plugin system
 
 plugins are supposed to be run when image is built and we need to extract some information
 """
-import copy
 import logging
 import os
-import traceback
-import imp
+import threading
 
-from atomic_reactor.util import process_substitutions
+from atomic_reactor.util import process_substitutions, load_source
 
 MODULE_EXTENSIONS = ('.py', '.pyc', '.pyo')
 logger = logging.getLogger(__name__)
 
+# modules already loaded by PluginsRunner.load_plugins: path -> module
+_MODULE_CACHE = {}
+# default arguments of plugin requests without 'args'; never modify it
+_EMPTY_ARGS = {}
+
 
 class PluginFailedException(Exception):
     """ There was an error during plugin execution """
@@ -35,6 +38,10 @@ class Plugin(object):
     key = None
     # by default, if plugin fails (raises exc), execution continues
     can_fail = True
+    # plugins which don't depend on other plugins and don't change shared state
+    # (e.g. they only talk to remote services) may run concurrently with
+    # neighbouring independent plugins
+    independent = False
 
     def __init__(self, *args, **kwargs):
         """
@@ -104,22 +111,26 @@ class PluginsRunner(object):
         # imp.findmodule('atomic_reactor') doesn't work
         plugins_dir = os.path.join(os.path.dirname(__file__), 'plugins')
         logger.debug("loading plugins from dir '%s'", plugins_dir)
+        # skip __init__.py and private modules, they don't define any plugins
         files = [os.path.join(plugins_dir, f) \
                  for f in os.listdir(plugins_dir) \
-                 if f.endswith(".py")]
+                 if f.endswith(".py") and not f.startswith("_")]
         if self.plugin_files:
             logger.debug("loading additional plugins from files '%s'", self.plugin_files)
             files += self.plugin_files
         plugin_class = globals()[plugin_class_name]
         plugin_classes = {}
         for f in files:
-            logger.debug("load file '%s'", f)
-            module_name = os.path.basename(f).rsplit('.', 1)[0]
-            try:
-                f_module = imp.load_source(module_name, f)
-            except (IOError, OSError, ImportError, SyntaxError) as ex:
-                logger.warning("can't load module '%s': %s", f, repr(ex))
-                continue
+            f_module = _MODULE_CACHE.get(f)
+            if f_module is None:
+                logger.debug("load file '%s'", f)
+                module_name = os.path.basename(f).rsplit('.', 1)[0]
+                try:
+                    f_module = load_source(module_name, f)
+                except (IOError, OSError, ImportError, SyntaxError) as ex:
+                    logger.warning("can't load module '%s': %s", f, repr(ex))
+                    continue
+                _MODULE_CACHE[f] = f_module
             for name in dir(f_module):
                 binding = getattr(f_module, name, None)
                 try:
@@ -146,49 +157,120 @@ class PluginsRunner(object):
         plugin_instance = plugin_class(**plugin_conf)
         return plugin_instance
 
+    def _parse_request(self, plugin_request):
+        """
+        validate plugin request and look up its plugin class
+
+        :param plugin_request: dict, request for plugin from configuration
+        :return: tuple (plugin name, plugin configuration, plugin class, can fail?)
+                 or None if request is invalid
+        """
+        if not isinstance(plugin_request, dict) or 'name' not in plugin_request:
+            logger.error("invalid plugin request, no key 'name': %s", plugin_request)
+            return None
+        plugin_name = plugin_request['name']
+        try:
+            plugin_class = self.plugin_classes[plugin_name]
+        except KeyError:
+            logger.error("no such plugin: '%s', did you set the correct plugin type?", plugin_name)
+            return None
+        plugin_conf = plugin_request.get("args", _EMPTY_ARGS)
+        plugin_can_fail = plugin_request.get('can_fail', getattr(plugin_class, "can_fail", True))
+        return plugin_name, plugin_conf, plugin_class, plugin_can_fail
+
+    def _run_plugin(self, plugin_instance, plugin_can_fail):
+        """
+        run single plugin instance
+
+        :param plugin_instance: instance of plugin
+        :param plugin_can_fail: bool, is it fine if plugin fails?
+        :return: tuple (plugin response, error message if plugin failed fatally else None)
+        """
+        try:
+            return plugin_instance.run(), None
+        except Exception as ex:
+            msg = "plugin '%s' raised an exception: '%s'" % (plugin_instance.key, repr(ex))
+            logger.warning(msg)
+            logger.debug("plugin traceback", exc_info=True)
+            if plugin_can_fail:
+                logger.info("error is not fatal, continuing...")
+                return msg, None
+            return msg, msg
+
+    def _run_plugins(self, parsed_requests, failed_msgs):
+        """
+        run provided plugins, concurrently if there is more than one of them
+
+        :param parsed_requests: list of tuples returned by _parse_request
+        :param failed_msgs: list, error messages of failed plugins are appended here
+        """
+        plugins = []
+        for plugin_name, plugin_conf, plugin_class, plugin_can_fail in parsed_requests:
+            logger.debug("running plugin '%s'", plugin_name)
+            plugin_instance = self.create_instance_from_plugin(plugin_class, plugin_conf)
+            plugins.append((plugin_instance, plugin_can_fail))
+
+        unhandled = None
+        if len(plugins) == 1:
+            outcomes = [self._run_plugin(*plugins[0])]
+        else:
+            outcomes = [None] * len(plugins)
+            # exceptions which _run_plugin doesn't handle, e.g. SystemExit
+            errors = [None] * len(plugins)
+
+            def run_in_thread(index, plugin_instance, plugin_can_fail):
+                try:
+                    outcomes[index] = self._run_plugin(plugin_instance, plugin_can_fail)
+                except BaseException as ex:
+                    errors[index] = ex
+
+            threads = [threading.Thread(target=run_in_thread, args=(index, ) + plugin)
+                       for index, plugin in enumerate(plugins)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            # same as when run one by one: keep results of plugins requested
+            # before the first unhandled exception and re-raise it
+            for index, error in enumerate(errors):
+                if error is not None:
+                    unhandled = error
+                    outcomes = outcomes[:index]
+                    break
+
+        # store results in the order plugins were requested
+        for (plugin_instance, _), (plugin_response, failed_msg) in zip(plugins, outcomes):
+            if failed_msg is not None:
+                failed_msgs.append(failed_msg)
+            self.plugins_results[plugin_instance.key] = plugin_response
+        if unhandled is not None:
+            raise unhandled
+
     def run(self):
         """
         run all requested plugins
+
+        consecutive plugins which are marked as independent are run concurrently,
+        all other plugins are run one by one in the requested order
         """
         failed_msgs = []
+        independent_requests = []
         for plugin_request in self.plugins_conf:
-            try:
-                plugin_name = plugin_request['name']
-            except (TypeError, KeyError):
-                logger.error("invalid plugin request, no key 'name': %s", plugin_request)
-                continue
-            try:
-                plugin_conf = plugin_request.get("args", {})
-            except AttributeError:
-                logger.error("invalid plugin request, no key 'args': %s", plugin_request)
+            parsed_request = self._parse_request(plugin_request)
+            if parsed_request is None:
                 continue
-            try:
-                plugin_class = self.plugin_classes[plugin_name]
-            except KeyError:
-                logger.error("no such plugin: '%s', did you set the correct plugin type?", plugin_name)
+            plugin_class = parsed_request[2]
+            if getattr(plugin_class, "independent", False):
+                independent_requests.append(parsed_request)
                 continue
-            try:
-                plugin_can_fail = plugin_request['can_fail']
-            except (TypeError, KeyError):
-                plugin_can_fail = getattr(plugin_class, "can_fail", True)
-
-            logger.debug("running plugin '%s'", plugin_name)
-
-            plugin_instance = self.create_instance_from_plugin(plugin_class, plugin_conf)
+            if independent_requests:
+                self._run_plugins(independent_requests, failed_msgs)
+                independent_requests = []
+            self._run_plugins([parsed_request], failed_msgs)
+        if independent_requests:
+            self._run_plugins(independent_requests, failed_msgs)
 
-            try:
-                plugin_response = plugin_instance.run()
-            except Exception as ex:
-                msg = "plugin '%s' raised an exception: '%s'" % (plugin_instance.key, repr(ex))
-                logger.warning(msg)
-                logger.debug(traceback.format_exc())
-                if not plugin_can_fail:
-                    failed_msgs.append(msg)
-                else:
-                    logger.info("error is not fatal, continuing...")
-                plugin_response = msg
-
-            self.plugins_results[plugin_instance.key] = plugin_response
         if len(failed_msgs) == 1:
             raise PluginFailedException(failed_msgs[0])
         elif len(failed_msgs) > 1:
@@ -222,19 +304,35 @@ class BuildPluginsRunner(PluginsRunner):
             'BUILD_SOURCE_PATH':  self.workflow.builder.source.path,
             'BASE_IMAGE': self.workflow.builder.base_image.to_str(),
         }
+        return self._translate_values(obj_to_translate, translation_dict)
+
+    def _translate_values(self, obj_to_translate, translation_dict):
+        """
+        recursively replace values of obj_to_translate found in translation_dict
+
+        :param obj_to_translate: dict, list or scalar value
+        :param translation_dict: dict, reserved value -> runtime value
+        :return: translated copy of obj_to_translate
+        """
+        def translate_scalar(value):
+            return translation_dict.get(value, value)
+
+        # scalar values are looked up directly, without a recursive call,
+        # so long lists of strings are cheap
         if isinstance(obj_to_translate, dict):
             # Recurse into dicts
-            translated_dict = copy.deepcopy(obj_to_translate)
-            for key, value in obj_to_translate.items():
-                translated_dict[key] = self._translate_special_values(value)
-
-            return translated_dict
+            return dict((key, self._translate_values(value, translation_dict)
+                         if isinstance(value, (dict, list))
+                         else translate_scalar(value))
+                        for key, value in obj_to_translate.items())
         elif isinstance(obj_to_translate, list):
             # Iterate over lists
-            return [self._translate_special_values(elem)
+            return [self._translate_values(elem, translation_dict)
+                    if isinstance(elem, (dict, list))
+                    else translate_scalar(elem)
                     for elem in obj_to_translate]
         else:
-            return translation_dict.get(obj_to_translate, obj_to_translate)
+            return translate_scalar(obj_to_translate)
 
     def create_instance_from_plugin(self, plugin_class, plugin_conf):
         translated_conf = self._translate_special_values(plugin_conf)
@@ -306,7 +404,7 @@ class InputPlugin(Plugin):
         :param build_json: dict, build json
         :return: dict, substituted build json
         """
-        print(self.substitutions)
+        self.log.debug("substitutions: %s", self.substitutions)
         process_substitutions(build_json, self.substitutions)
         return build_json
 
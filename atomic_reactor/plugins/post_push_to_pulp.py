@@ -73,10 +73,10 @@ class PulpUploader(object):
         else:
             if self.pulp_secret_path is not None:
                 path = self.pulp_secret_path
-                self.log.info("using configured path %s for secrets" % path)
+                self.log.info("using configured path %s for secrets", path)
             else:
                 path = os.environ["SOURCE_SECRET_PATH"]
-                self.log.info("SOURCE_SECRET_PATH=%s from environment" % path)
+                self.log.info("SOURCE_SECRET_PATH=%s from environment", path)
 
             # Work out the pathnames for the certificate/key pair.
             cer = os.path.join(path, self.CER)
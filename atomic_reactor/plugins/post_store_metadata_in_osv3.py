@@ -10,13 +10,11 @@ from __future__ import unicode_literals
 import json
 import os
 
-from osbs.api import OSBS
-from osbs.conf import Configuration
-
 from atomic_reactor.plugin import PostBuildPlugin
 from atomic_reactor.plugins.pre_return_dockerfile import CpDockerfilePlugin
 from atomic_reactor.plugins.pre_pyrpkg_fetch_artefacts import DistgitFetchArtefactsPlugin
 from atomic_reactor.plugins.post_rpmqa import PostBuildRPMqaPlugin
+from atomic_reactor.util import get_osbs
 
 
 class StoreMetadataInOSv3Plugin(PostBuildPlugin):
@@ -52,9 +50,7 @@ class StoreMetadataInOSv3Plugin(PostBuildPlugin):
 
         # initial setup will use host based auth: apache will be set to accept everything
         # from specific IP and will set specific X-Remote-User for such requests
-        osbs_conf = Configuration(conf_file=None, openshift_uri=self.url,
-                                  use_auth=self.use_auth, verify_ssl=self.verify_ssl)
-        osbs = OSBS(osbs_conf, osbs_conf)
+        osbs = get_osbs(self.workflow, self.url, self.verify_ssl, self.use_auth)
 
         # usually repositories formed from NVR labels
         # these should be used for pulling and layering
@@ -31,13 +31,12 @@ third optional argument of run function is logger (if not specified, all logs ar
 """
 
 import os
-import imp
 import shutil
 import tempfile
 
 
 from atomic_reactor.plugin import PrePublishPlugin
-from atomic_reactor.util import LazyGit
+from atomic_reactor.util import LazyGit, load_source
 
 
 class ImageTestPlugin(PrePublishPlugin):
@@ -84,7 +83,7 @@ class ImageTestPlugin(PrePublishPlugin):
             tests_file = os.path.abspath(os.path.join(g.git_path, self.tests_git_path))
             self.log.debug("loading file with tests: '%s'", tests_file)
             module_name, module_ext = os.path.splitext(self.tests_git_path)
-            tests_module = imp.load_source(module_name, tests_file)
+            tests_module = load_source(module_name, tests_file)
 
             results, passed = tests_module.run(image_id=self.image_id, tests=self.tests,
                                                git_repo_path = tmpdir, logger=self.log,
@@ -15,11 +15,20 @@ import re
 import shlex
 import shutil
 import subprocess
+import sys
 import tempfile
 import logging
 import uuid
 from atomic_reactor.constants import DOCKERFILE_FILENAME, PY2
 
+try:
+    from importlib.machinery import SourceFileLoader
+    from importlib.util import module_from_spec, spec_from_file_location
+except ImportError:
+    # Python 2 and Python < 3.5
+    import imp
+    module_from_spec = None
+
 
 logger = logging.getLogger(__name__)
 
@@ -314,6 +323,61 @@ class LazyGit(object):
                 shutil.rmtree(self.our_tmpdir)
 
 
+def load_source(module_name, path):
+    """
+    load python module from source file, replacement for deprecated imp.load_source
+
+    module is registered in sys.modules, bytecode cache is used if available
+
+    :param module_name: str, name of the module
+    :param path: str, path to python source file
+    :return: module
+    """
+    if module_from_spec is None:
+        return imp.load_source(module_name, path)
+    # loader has to be explicit, otherwise files without .py suffix are not recognized
+    loader = SourceFileLoader(module_name, path)
+    spec = spec_from_file_location(module_name, path, loader=loader)
+    module = module_from_spec(spec)
+    previous_module = sys.modules.get(module_name)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        if previous_module is None:
+            del sys.modules[module_name]
+        else:
+            sys.modules[module_name] = previous_module
+        raise
+    return module
+
+
+def get_osbs(workflow, url, verify_ssl, use_auth):
+    """
+    get OSBS client for provided OpenShift instance, reuse existing
+    client from workflow if there is one, so its connections are kept alive
+
+    :param workflow: DockerBuildWorkflow instance
+    :param url: str, URL to OSv3 instance
+    :param verify_ssl: bool, verify SSL certificate?
+    :param use_auth: bool, initiate authentication with openshift?
+    :return: OSBS instance
+    """
+    key = (url, verify_ssl, use_auth)
+    try:
+        return workflow.osbs_clients[key]
+    except KeyError:
+        pass
+    # osbs-client is optional, import it only when it's really needed
+    from osbs.api import OSBS
+    from osbs.conf import Configuration
+    osbs_conf = Configuration(conf_file=None, openshift_uri=url,
+                              use_auth=use_auth, verify_ssl=verify_ssl)
+    osbs = OSBS(osbs_conf, osbs_conf)
+    workflow.osbs_clients[key] = osbs
+    return osbs
+
+
 def escape_dollar(v):
     try:
         str_type = unicode
@@ -389,8 +453,8 @@ def _process_plugin_substitution(mapping, key_parts, value):
     try:
         plugin_type, plugin_name, arg_name = key_parts
     except ValueError:
-        logger.error("invalid absolute path '{0}': it requires exactly three parts: "
-                     "plugin type, plugin name, argument name (dot separated)".format(key_parts))
+        logger.error("invalid absolute path '%s': it requires exactly three parts: "
+                     "plugin type, plugin name, argument name (dot separated)", key_parts)
         raise ValueError("invalid absolute path to plugin, it should be "
                          "plugin_type.plugin_name.argument_name")
 
@@ -10,6 +10,8 @@ from __future__ import unicode_literals
 
 import json
 import os
+import sys
+import threading
 
 from flexmock import flexmock
 import pytest
@@ -17,7 +19,7 @@ import pytest
 from atomic_reactor.core import DockerTasker
 from atomic_reactor.inner import DockerBuildWorkflow
 from atomic_reactor.plugin import PreBuildPluginsRunner, PostBuildPluginsRunner, \
-        InputPluginsRunner, PluginFailedException
+        InputPluginsRunner, PluginFailedException, PostBuildPlugin
 from atomic_reactor.plugins.post_rpmqa import PostBuildRPMqaPlugin
 from atomic_reactor.util import ImageName
 from tests.constants import DOCKERFILE_GIT
@@ -39,19 +41,32 @@ def test_load_postbuild_plugins():
     assert len(runner.plugin_classes) > 0
 
 
+def test_load_plugins_only_once():
+    workflow = DockerBuildWorkflow(SOURCE, "")
+    runner = PostBuildPluginsRunner(DockerTasker(), workflow, None)
+    another_runner = PostBuildPluginsRunner(DockerTasker(), workflow, None)
+    # modules are not imported again, hence classes are identical
+    assert runner.plugin_classes[PostBuildRPMqaPlugin.key] is \
+        another_runner.plugin_classes[PostBuildRPMqaPlugin.key]
+
+
 class X(object):
     pass
 
 
-def test_rpmqa_plugin():
-    tasker = DockerTasker()
-    workflow = DockerBuildWorkflow(SOURCE, "test-image")
+def _mock_builder(workflow):
     setattr(workflow, 'builder', X())
     setattr(workflow.builder, 'image_id', "asd123")
     setattr(workflow.builder, 'base_image', ImageName(repo='fedora', tag='21'))
     setattr(workflow.builder, "source", X())
     setattr(workflow.builder.source, 'dockerfile_path', "/non/existent")
     setattr(workflow.builder.source, 'path', "/non/existent")
+
+
+def test_rpmqa_plugin():
+    tasker = DockerTasker()
+    workflow = DockerBuildWorkflow(SOURCE, "test-image")
+    _mock_builder(workflow)
     runner = PostBuildPluginsRunner(tasker, workflow,
                                     [{"name": PostBuildRPMqaPlugin.key,
                                       "args": {'image_id': TEST_IMAGE}}])
@@ -61,6 +76,107 @@ def test_rpmqa_plugin():
     assert len(results[PostBuildRPMqaPlugin.key]) > 0
 
 
+@pytest.mark.parametrize('plugins_conf', [
+    ["not a dict"],
+    [{"args": {}}],
+    [{"name": "no_such_plugin"}],
+])
+def test_invalid_plugin_request_is_skipped(plugins_conf):
+    runner = PostBuildPluginsRunner(DockerTasker(), DockerBuildWorkflow(SOURCE, ""), plugins_conf)
+    assert runner.run() == {}
+
+
+def test_translate_special_values():
+    workflow = DockerBuildWorkflow(SOURCE, "test-image")
+    _mock_builder(workflow)
+    runner = PostBuildPluginsRunner(DockerTasker(), workflow, None)
+    conf = {
+        "image_id": "BUILT_IMAGE_ID",
+        "nested": {"base": ["BASE_IMAGE", 1, None]},
+        "untouched": "value",
+    }
+    translated = runner._translate_special_values(conf)
+    assert translated == {
+        "image_id": "asd123",
+        "nested": {"base": ["fedora:21", 1, None]},
+        "untouched": "value",
+    }
+    # original configuration is left intact
+    assert conf["nested"]["base"][0] == "BASE_IMAGE"
+
+
+class WaitingPlugin(PostBuildPlugin):
+    key = "waiting"
+    independent = True
+    event = threading.Event()
+
+    def run(self):
+        self.event.wait(5)
+        return self.event.is_set()
+
+
+class SignallingPlugin(PostBuildPlugin):
+    key = "signalling"
+    independent = True
+
+    def run(self):
+        WaitingPlugin.event.set()
+        return True
+
+
+class ExitingPlugin(PostBuildPlugin):
+    key = "exiting"
+    independent = True
+
+    def run(self):
+        sys.exit(3)
+
+
+class FailingPlugin(PostBuildPlugin):
+    key = "failing"
+    independent = True
+    can_fail = False
+
+    def run(self):
+        raise RuntimeError("failed")
+
+
+def test_independent_plugins_run_concurrently():
+    workflow = DockerBuildWorkflow(SOURCE, "test-image")
+    _mock_builder(workflow)
+    runner = PostBuildPluginsRunner(DockerTasker(), workflow,
+                                    [{"name": WaitingPlugin.key},
+                                     {"name": SignallingPlugin.key},
+                                     {"name": FailingPlugin.key}])
+    for plugin_class in (WaitingPlugin, SignallingPlugin, FailingPlugin):
+        runner.plugin_classes[plugin_class.key] = plugin_class
+    WaitingPlugin.event = threading.Event()
+    with pytest.raises(PluginFailedException):
+        runner.run()
+    # waiting plugin would time out if plugins were run one by one
+    assert workflow.postbuild_results[WaitingPlugin.key] is True
+    assert workflow.postbuild_results[SignallingPlugin.key] is True
+    assert "failed" in workflow.postbuild_results[FailingPlugin.key]
+
+
+def test_independent_plugin_exit_is_propagated():
+    workflow = DockerBuildWorkflow(SOURCE, "test-image")
+    _mock_builder(workflow)
+    runner = PostBuildPluginsRunner(DockerTasker(), workflow,
+                                    [{"name": SignallingPlugin.key},
+                                     {"name": ExitingPlugin.key},
+                                     {"name": FailingPlugin.key}])
+    for plugin_class in (SignallingPlugin, ExitingPlugin, FailingPlugin):
+        runner.plugin_classes[plugin_class.key] = plugin_class
+    with pytest.raises(SystemExit) as exc_info:
+        runner.run()
+    assert exc_info.value.code == 3
+    # plugins requested before the exiting one keep their results
+    assert workflow.postbuild_results[SignallingPlugin.key] is True
+    assert ExitingPlugin.key not in workflow.postbuild_results
+    assert FailingPlugin.key not in workflow.postbuild_results
+
+
 class TestInputPluginsRunner(object):
     def test_substitution(self, tmpdir):
         tmpdir_path = str(tmpdir)
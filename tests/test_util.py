@@ -9,6 +9,8 @@ of the BSD license. See the LICENSE file for details.
 from __future__ import unicode_literals
 
 import os
+import sys
+import types
 
 import pytest
 import six
@@ -21,7 +23,7 @@ except ImportError:
 import docker
 from atomic_reactor.util import ImageName, \
     wait_for_command, clone_git_repo, LazyGit, figure_out_dockerfile, render_yum_repo, \
-    process_substitutions
+    process_substitutions, load_source, get_osbs
 from tests.constants import NON_ASCII, DOCKERFILE_GIT, INPUT_IMAGE, MOCK, DOCKERFILE_SHA1
 
 if MOCK:
@@ -153,3 +155,59 @@ def test_process_substitutions(dct, subst, expected):
     else:
         process_substitutions(dct, subst)
         assert dct == expected
+
+
+def test_load_source(tmpdir):
+    module_path = os.path.join(str(tmpdir), "loaded_module.py")
+    with open(module_path, "w") as fp:
+        fp.write("VALUE = 42\n")
+    module = load_source("loaded_module", module_path)
+    assert module.VALUE == 42
+
+
+def test_load_source_without_py_suffix(tmpdir):
+    module_path = os.path.join(str(tmpdir), "plugin_without_suffix")
+    with open(module_path, "w") as fp:
+        fp.write("VALUE = 42\n")
+    module = load_source("plugin_without_suffix", module_path)
+    assert module.VALUE == 42
+
+
+def test_load_source_syntax_error(tmpdir):
+    module_path = os.path.join(str(tmpdir), "broken_module.py")
+    with open(module_path, "w") as fp:
+        fp.write("def broken(:\n")
+    with pytest.raises(SyntaxError):
+        load_source("broken_module", module_path)
+    assert "broken_module" not in sys.modules
+
+
+class FakeOSBSConfiguration(object):
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+
+class FakeOSBS(object):
+    def __init__(self, openshift_conf, build_conf):
+        self.conf = openshift_conf
+
+
+def test_get_osbs_reuses_client(monkeypatch):
+    osbs_api = types.ModuleType(str("osbs.api"))
+    osbs_api.OSBS = FakeOSBS
+    osbs_conf = types.ModuleType(str("osbs.conf"))
+    osbs_conf.Configuration = FakeOSBSConfiguration
+    monkeypatch.setitem(sys.modules, "osbs", types.ModuleType(str("osbs")))
+    monkeypatch.setitem(sys.modules, "osbs.api", osbs_api)
+    monkeypatch.setitem(sys.modules, "osbs.conf", osbs_conf)
+
+    class Workflow(object):
+        def __init__(self):
+            self.osbs_clients = {}
+
+    workflow = Workflow()
+    osbs = get_osbs(workflow, "http://example.com/", True, True)
+    assert osbs.conf.kwargs["openshift_uri"] == "http://example.com/"
+    assert get_osbs(workflow, "http://example.com/", True, True) is osbs
+    assert get_osbs(workflow, "http://example.com/", False, True) is not osbs
+    assert len(workflow.osbs_clients) == 2